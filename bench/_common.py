@@ -0,0 +1,168 @@
+# bench/_common.py
+# Utilitários compartilhados pelos benchmarks (somente stdlib).
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import subprocess
+import threading
+import http.client
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "bench" / "results"
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_http(url: str, timeout: float = 30.0) -> None:
+    """Espera até a URL responder 200 (servidor subindo)."""
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", (parts.path or "/") + (f"?{parts.query}" if parts.query else ""))
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+            conn.close()
+        except OSError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"servidor não respondeu em {timeout}s: {url}")
+
+def summarize(latencies_ms: List[float], errors: int, elapsed_s: float,
+              statuses: Optional[Dict[int, int]] = None) -> Dict[str, Any]:
+    lat = sorted(latencies_ms)
+    n = len(lat)
+
+    def pct(p: float) -> float:
+        if not n:
+            return 0.0
+        return round(lat[min(n - 1, int(round(p / 100 * (n - 1))))], 3)
+
+    out = {
+        "requests": n,
+        "errors": errors,
+        "elapsed_s": round(elapsed_s, 3),
+        "throughput_rps": round(n / elapsed_s, 1) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(lat) / n, 3) if n else 0.0,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+        "max_ms": round(lat[-1], 3) if n else 0.0,
+    }
+    if statuses is not None:
+        out["statuses"] = {str(k): v for k, v in sorted(statuses.items())}
+    return out
+
+def run_load(call: Callable[[Any], int], make_ctx: Callable[[], Any],
+             concurrency: int, total: int, ok_statuses=(200,)) -> Dict[str, Any]:
+    """
+    Dispara `total` chamadas distribuídas em `concurrency` threads.
+    Cada thread cria seu contexto com make_ctx() (ex.: conexão keep-alive) e
+    call(ctx) devolve o status HTTP (ou -1 em erro de rede).
+    """
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    counter = iter(range(total))
+    counter_lock = threading.Lock()
+    start = threading.Barrier(concurrency + 1)
+
+    def worker():
+        ctx = make_ctx()
+        local_lat: List[float] = []
+        local_st: Dict[int, int] = {}
+        start.wait()
+        while True:
+            with counter_lock:
+                if next(counter, None) is None:
+                    break
+            t0 = time.perf_counter()
+            try:
+                status = call(ctx)
+            except Exception:
+                status = -1
+            local_lat.append((time.perf_counter() - t0) * 1000)
+            local_st[status] = local_st.get(status, 0) + 1
+        close = getattr(ctx, "close", None)
+        if close:
+            close()
+        with lock:
+            latencies.extend(local_lat)
+            for k, v in local_st.items():
+                statuses[k] = statuses.get(k, 0) + v
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    start.wait()
+    t0 = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+    errors = sum(v for k, v in statuses.items() if k not in ok_statuses)
+    return summarize(latencies, errors, elapsed, statuses)
+
+class KeepAlive:
+    """Conexão HTTP/1.1 persistente por thread, reaberta após erro."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.host, self.port, self.timeout = parts.hostname, parts.port, timeout
+        self.conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            self.conn.request(method, path, body=body, headers=headers or {})
+            resp = self.conn.getresponse()
+            return resp.status, resp.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+def git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+def save_results(name: str, params: Dict[str, Any], results: List[Dict[str, Any]],
+                 out: Optional[str] = None) -> Path:
+    """Grava bench/results/<name>-<rev>.json (ou `out`) para comparar entre commits."""
+    rev = git_rev()
+    path = Path(out) if out else RESULTS_DIR / f"{name}-{rev}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "benchmark": name,
+        "git_rev": rev,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+    path.write_text(json.dumps(doc, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+def int_list(s: str) -> List[int]:
+    return [int(x.replace("_", "")) for x in s.split(",") if x.strip()]
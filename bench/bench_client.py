@@ -0,0 +1,112 @@
+"""
+Benchmark de throughput e latência de cauda do cliente Movidesk (movidesk/api_client.py)
+contra o simulador local (bench/movidesk_sim.py).
+
+O simulador sobe em thread e MOVIDESK_API_BASE é apontado para ele antes de importar
+o cliente. Cada submissão percorre o caminho completo de apontar_horas (validação,
+montagem do payload, HTTP, tratamento de status), no modo sync (threads, uma conexão
+nova por chamada) e/ou async (AsyncMovideskClient, pool keep-alive). Resultados em
+bench/results/client-<rev>.json.
+
+Uso (na raiz do repositório, com requests e httpx instalados):
+    python bench/bench_client.py
+    python bench/bench_client.py --concurrency 1,8,32 --requests 500 --latency-ms 80 --jitter-ms 40
+    python bench/bench_client.py --p429 0.05 --retry-after 2 --p5xx 0.02 --p401 0.01
+    python bench/bench_client.py --modes async --concurrency 64,256 --requests 5000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import itertools
+
+from _common import REPO_ROOT, run_load, save_results, summarize, int_list
+from movidesk_sim import MovideskSimulator, add_sim_args, sim_config_from_args
+
+TOKEN = "bench-token"
+TEXTS = {}  # mensagens padrão do api_client bastam aqui
+
+def _entry(i: int):
+    """Apontamento válido e distinto para o índice i (ticket, descrição, data, início, fim)."""
+    h = 8 + i % 10
+    return (str(1000 + i % 500), f"bench {i}", f"{1 + i % 28:02d}/03/2025", f"{h:02d}:00", f"{h:02d}:30")
+
+def run_async(client_cls, cfg, texts, agent_id, concurrency: int, total: int):
+    """Mesmo desenho de run_load, com `concurrency` coroutines sobre um único AsyncMovideskClient."""
+    from movidesk.errors import AppError
+    seq = itertools.count()
+
+    async def go():
+        latencies, errors = [], 0
+        async with client_cls(cfg, texts, max_concurrency=concurrency) as cli:
+            async def worker():
+                nonlocal errors
+                while True:
+                    i = next(seq)
+                    if i >= total:
+                        return
+                    t0 = time.perf_counter()
+                    try:
+                        await cli.apontar_horas(*_entry(i), agent_id)
+                    except AppError:
+                        errors += 1
+                    latencies.append((time.perf_counter() - t0) * 1000)
+
+            t0 = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            return summarize(latencies, errors, time.perf_counter() - t0)
+
+    return asyncio.run(go())
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int_list, default=int_list("1,4,16,32"))
+    ap.add_argument("--requests", type=int, default=500, help="submissões por nível de concorrência")
+    ap.add_argument("--agent-id", default="894353874")
+    ap.add_argument("--modes", default="sync,async", help="sync, async ou ambos")
+    ap.add_argument("--out", default=None, help="arquivo JSON de saída")
+    add_sim_args(ap)
+    args = ap.parse_args(argv)
+
+    with MovideskSimulator(sim_config_from_args(args, TOKEN)) as sim:
+        os.environ["MOVIDESK_API_BASE"] = sim.api_base
+        sys.path.insert(0, str(REPO_ROOT))
+        from movidesk.api_client import apontar_horas, AsyncMovideskClient
+        from movidesk.errors import AppError
+
+        cfg = {"token": TOKEN}
+        seq = itertools.count()  # next() em itertools.count é atômico no CPython
+
+        def submit(_ctx) -> int:
+            ticket, desc, data, ini, fim = _entry(next(seq))
+            try:
+                apontar_horas(cfg, ticket, desc, data, ini, fim, args.agent_id, TEXTS)
+                return 200
+            except AppError:
+                return 0  # o detalhe por status vem das estatísticas do simulador
+
+        modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+        results = []
+        for mode in modes:
+            for conc in args.concurrency:
+                sim.stats.reset()
+                if mode == "async":
+                    r = run_async(AsyncMovideskClient, cfg, TEXTS, args.agent_id, conc, args.requests)
+                else:
+                    r = run_load(submit, lambda: None, conc, args.requests)
+                    r.pop("statuses", None)
+                r.update({"scenario": "apontar_horas", "mode": mode, "concurrency": conc,
+                          "upstream": sim.stats.snapshot()})
+                results.append(r)
+                print(f"{mode:<5} c={conc:<3} {r['throughput_rps']:>8.1f} apont/s  p50={r['p50_ms']:.2f}ms "
+                      f"p95={r['p95_ms']:.2f}ms p99={r['p99_ms']:.2f}ms errors={r['errors']} "
+                      f"upstream={r['upstream']['statuses']}")
+
+    params = {"modes": modes, "concurrency": args.concurrency, "requests": args.requests,
+              "latency_ms": args.latency_ms, "jitter_ms": args.jitter_ms, "p401": args.p401,
+              "p429": args.p429, "retry_after": args.retry_after, "p5xx": args.p5xx, "seed": args.seed}
+    print(f"resultados: {save_results('client', params, results, args.out)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compara tamanho de payload e tempo de (de)codificação dos formatos servidos por
+GET /client-config e GET /usuarios: JSON indentado (formato do arquivo), JSON
+minificado e msgpack, cada um sem compressão, com gzip e com brotli.
+
+Roda offline (não sobe servidor). Os níveis de compressão são os mesmos de
+server._negotiated. msgpack e brotli são pulados se não estiverem instalados.
+Resultados em bench/results/encoding-<rev>.json.
+
+Uso:
+    python bench/bench_encoding.py
+    python bench/bench_encoding.py --users 100,10000,100000 --repeat 20
+"""
+import gzip
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+from _common import save_results, int_list
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+def make_config(n_users: int) -> Dict[str, Any]:
+    usuarios = {"admin": {"senha": "", "agent_id": "", "admin": True}}
+    for i in range(n_users):
+        # hash no mesmo formato de movidesk/security.py (pbkdf2$iter$salt$hash)
+        usuarios[f"agente.{i:06d}"] = {
+            "senha": f"pbkdf2$120000${'S' * 22}==${'H' * 42}{i:02d}=",
+            "agent_id": str(100000000 + i),
+            "admin": i % 50 == 0,
+        }
+    return {"version": 42, "usuarios": usuarios, "token": "9ae27bf5-ea70-4e54-9ce6-4fe71d1ff6f8", "lang": "pt-BR"}
+
+def make_usuarios(n_users: int) -> List[Dict[str, Any]]:
+    return [{"id": i + 1, "nome": f"agente.{i:06d}"} for i in range(n_users)]
+
+def _serializers() -> Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    out = {
+        "json_indent2": (lambda d: json.dumps(d, indent=2, ensure_ascii=False).encode("utf-8"), json.loads),
+        "json_compact": (lambda d: json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+                         json.loads),
+    }
+    if msgpack is not None:
+        out["msgpack"] = (lambda d: msgpack.packb(d, use_bin_type=True), lambda b: msgpack.unpackb(b, raw=False))
+    return out
+
+def _compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    out = {
+        "identity": (lambda b: b, lambda b: b),
+        "gzip": (lambda b: gzip.compress(b, compresslevel=6), gzip.decompress),
+    }
+    if brotli is not None:
+        out["br"] = (lambda b: brotli.compress(b, quality=5), brotli.decompress)
+    return out
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return round(best * 1000, 3)
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int_list, default=int_list("10,1000,10000,100000"))
+    ap.add_argument("--repeat", type=int, default=5, help="repetições por medida (vale a melhor)")
+    ap.add_argument("--out", default=None, help="arquivo JSON de saída")
+    args = ap.parse_args(argv)
+
+    results = []
+    for n in args.users:
+        for payload, data in (("client-config", make_config(n)), ("usuarios", make_usuarios(n))):
+            for sname, (ser, de) in _serializers().items():
+                raw = ser(data)
+                for cname, (comp, decomp) in _compressors().items():
+                    wire = comp(raw)
+                    r = {
+                        "payload": payload,
+                        "users": n,
+                        "encoding": f"{sname}+{cname}",
+                        "bytes": len(wire),
+                        "ratio_vs_json_indent2": None,
+                        "encode_ms": _best_ms(lambda: comp(ser(data)), args.repeat),
+                        "decode_ms": _best_ms(lambda: de(decomp(wire)), args.repeat),
+                    }
+                    results.append(r)
+            base = next(r["bytes"] for r in results
+                        if r["payload"] == payload and r["users"] == n and r["encoding"] == "json_indent2+identity")
+            for r in results:
+                if r["payload"] == payload and r["users"] == n:
+                    r["ratio_vs_json_indent2"] = round(r["bytes"] / base, 4)
+                    print(f"{payload:<14} users={n:<7} {r['encoding']:<22} {r['bytes']:>11,} B "
+                          f"({r['ratio_vs_json_indent2']:.3f})  enc={r['encode_ms']:.2f}ms dec={r['decode_ms']:.2f}ms")
+
+    params = {"users": args.users, "repeat": args.repeat,
+              "msgpack": msgpack is not None, "brotli": brotli is not None}
+    print(f"resultados: {save_results('encoding', params, results, args.out)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Benchmark de carga do backend FastAPI (server.py).
+
+Sobe o app com uvicorn em um processo separado, apontando DB_PATH e
+CLIENT_CONFIG_PATH para um diretório temporário semeado com N usuários,
+e mede throughput e latência (p50/p95/p99) de cada cenário em cada nível
+de concorrência. O resultado vai para bench/results/server-<rev>.json.
+
+Uso (na raiz do repositório, com as dependências de requirements.txt):
+    python bench/bench_server.py
+    python bench/bench_server.py --users 10,1000,100000 --concurrency 1,8,32 --requests 2000
+    python bench/bench_server.py --scenarios get_config,health --out /tmp/antes.json
+"""
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import itertools
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, Callable
+
+from _common import (REPO_ROOT, KeepAlive, free_port, wait_http, run_load,
+                     save_results, int_list)
+
+ADMIN_KEY = "bench-admin-key"
+
+def seed(tmp: Path, n_users: int) -> Dict[str, str]:
+    """Cria usuarios.db e client-config.json com n_users cada; devolve o env do servidor."""
+    db_path = tmp / "usuarios.db"
+    conn = sqlite3.connect(db_path)
+    # só a tabela base de server.get_db(); nome_norm, índices e FTS5 vêm da migração do servidor
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL
+        )
+        """
+    )
+    conn.executemany("INSERT INTO usuarios (nome) VALUES (?)",
+                     ((f"agente.{i:06d}",) for i in range(n_users)))
+    conn.commit()
+    conn.close()
+
+    cfg_path = tmp / "client-config.json"
+    usuarios = {"admin": {"senha": "", "agent_id": "", "admin": True}}
+    for i in range(n_users):
+        usuarios[f"agente.{i:06d}"] = {"senha": "", "agent_id": str(100000 + i), "admin": False}
+    cfg = {"version": 1, "usuarios": usuarios, "token": "bench-token", "lang": "pt-BR"}
+    cfg_path.write_text(json.dumps(cfg, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    env = dict(os.environ)
+    # o benchmark vem todo de 127.0.0.1: sem throttling, a menos que pedido explicitamente
+    env.setdefault("CONFIG_GET_RATE", "0")
+    env.setdefault("CONFIG_PUT_RATE", "0")
+    env.update({
+        "DB_PATH": str(db_path),
+        "CLIENT_CONFIG_PATH": str(cfg_path),
+        "CONFIG_ADMIN_KEY": ADMIN_KEY,
+    })
+    return env
+
+def start_server(env: Dict[str, str], port: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "server:app", "--host", "127.0.0.1",
+           "--port", str(port), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env)
+    try:
+        wait_http(f"http://127.0.0.1:{port}/health")
+        # /health não toca o banco: uma busca espera a migração (backfill de nome_norm,
+        # rebuild do FTS5) terminar, para ela não cair dentro dos primeiros cenários medidos
+        wait_http(f"http://127.0.0.1:{port}/usuarios?q=x", timeout=120)
+    except Exception:
+        proc.kill()
+        raise
+    return proc
+
+_put_seq = itertools.count()
+
+def _put_body() -> bytes:
+    # rotaciona 50 nomes para o arquivo não crescer ao longo do benchmark
+    i = next(_put_seq) % 50
+    return json.dumps({"usuarios": {f"bench.put.{i}": {"senha": "", "agent_id": str(i), "admin": False}}}).encode()
+
+SCENARIOS: Dict[str, Callable[[KeepAlive], int]] = {
+    "health": lambda c: c.request("GET", "/health")[0],
+    "get_config": lambda c: c.request("GET", "/client-config")[0],
+    "put_config": lambda c: c.request(
+        "PUT", "/client-config", body=_put_body(),
+        headers={"Content-Type": "application/json", "X-Config-Key": ADMIN_KEY})[0],
+    "list_usuarios": lambda c: c.request("GET", "/usuarios")[0],
+    "search_usuarios": lambda c: c.request("GET", f"/usuarios?q=agente.{next(_put_seq) % 1000:03d}&limit=20")[0],
+    "post_usuarios": lambda c: c.request(
+        "POST", "/usuarios", body=json.dumps({"nome": f"bench.post.{next(_put_seq)}"}).encode(),
+        headers={"Content-Type": "application/json"})[0],
+}
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--users", type=int_list, default=int_list("10,1000,10000,100000"),
+                    help="tamanhos de dataset (lista separada por vírgula)")
+    ap.add_argument("--concurrency", type=int_list, default=int_list("1,8,32"))
+    ap.add_argument("--requests", type=int, default=1000, help="requisições por cenário/concorrência")
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--out", default=None, help="arquivo JSON de saída")
+    args = ap.parse_args(argv)
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        ap.error(f"cenários desconhecidos: {', '.join(sorted(unknown))}")
+
+    results = []
+    for n_users in args.users:
+        with tempfile.TemporaryDirectory(prefix="movidesk-bench-") as tmp:
+            env = seed(Path(tmp), n_users)
+            port = free_port()
+            base = f"http://127.0.0.1:{port}"
+            proc = start_server(env, port)
+            try:
+                for name in scenarios:
+                    for conc in args.concurrency:
+                        r = run_load(SCENARIOS[name], lambda: KeepAlive(base), conc, args.requests)
+                        r.update({"scenario": name, "users": n_users, "concurrency": conc})
+                        results.append(r)
+                        print(f"{name:<14} users={n_users:<7} c={conc:<3} "
+                              f"{r['throughput_rps']:>9.1f} req/s  p50={r['p50_ms']:.2f}ms "
+                              f"p95={r['p95_ms']:.2f}ms p99={r['p99_ms']:.2f}ms errors={r['errors']}")
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+    params = {"users": args.users, "concurrency": args.concurrency,
+              "requests": args.requests, "scenarios": scenarios}
+    print(f"resultados: {save_results('server', params, results, args.out)}")
+
+if __name__ == "__main__":
+    main()
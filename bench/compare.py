@@ -0,0 +1,40 @@
+"""
+Compara dois arquivos de resultado de benchmark (ex.: antes/depois de um commit).
+
+Uso:
+    python bench/compare.py bench/results/server-abc123.json bench/results/server-def456.json
+"""
+import sys
+import json
+from typing import Dict, Any, Tuple
+
+_KEY_FIELDS = ("scenario", "users", "concurrency", "mode", "payload", "encoding")
+_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+def _key(r: Dict[str, Any]) -> Tuple:
+    return tuple((k, r[k]) for k in _KEY_FIELDS if k in r)
+
+def _load(path: str) -> Dict[Tuple, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    return {_key(r): r for r in doc["results"]}
+
+def main(argv=None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip())
+        sys.exit(2)
+    old, new = _load(argv[0]), _load(argv[1])
+    for key in sorted(set(old) & set(new), key=str):
+        label = " ".join(f"{k}={v}" for k, v in key)
+        cols = []
+        for m in _METRICS:
+            a, b = old[key].get(m), new[key].get(m)
+            if a is None or b is None:
+                continue
+            delta = f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+            cols.append(f"{m}={a}->{b} ({delta})")
+        print(f"{label}\n    " + "  ".join(cols))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Simulador local da API do Movidesk (somente stdlib).
+
+Imita o contrato usado por movidesk/api_client.py:
+    PATCH /public/v1/tickets?token=<token>&id=<ticket>
+    body: {"actions": [{"type": 2, "description": ..., "createdBy": {...},
+                        "timeAppointments": [{...}]}]}
+
+e injeta latência e falhas configuráveis: 401, 429 com Retry-After e 5xx.
+
+Uso standalone (e depois MOVIDESK_API_BASE=http://127.0.0.1:8900/public/v1/tickets):
+    python bench/movidesk_sim.py --port 8900 --latency-ms 80 --p429 0.05 --retry-after 2
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass, field
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+TICKETS_PATH = "/public/v1/tickets"
+
+@dataclass
+class SimConfig:
+    token: str = "sim-token"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    p401: float = 0.0
+    p429: float = 0.0
+    retry_after: int = 1
+    p5xx: float = 0.0
+    seed: Optional[int] = None
+
+@dataclass
+class SimStats:
+    statuses: Dict[int, int] = field(default_factory=dict)
+    actions: int = 0
+    appointments: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, status: int, actions: int = 0, appointments: int = 0) -> None:
+        with self.lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.actions += actions
+            self.appointments += appointments
+
+    def reset(self) -> None:
+        with self.lock:
+            self.statuses.clear()
+            self.actions = self.appointments = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        with self.lock:
+            return {
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "actions": self.actions,
+                "appointments": self.appointments,
+            }
+
+def _validate_body(body: object) -> Tuple[int, int]:
+    """Confere o formato do payload; devolve (ações, apontamentos) ou levanta ValueError."""
+    if not isinstance(body, dict) or not isinstance(body.get("actions"), list) or not body["actions"]:
+        raise ValueError("actions ausente")
+    appointments = 0
+    for a in body["actions"]:
+        if not isinstance(a, dict) or a.get("type") != 2:
+            raise ValueError("action.type deve ser 2")
+        if not isinstance((a.get("createdBy") or {}).get("id"), str):
+            raise ValueError("action.createdBy.id ausente")
+        tas = a.get("timeAppointments")
+        if not isinstance(tas, list) or not tas:
+            raise ValueError("timeAppointments ausente")
+        for t in tas:
+            for k in ("activity", "date", "periodStart", "periodEnd", "workTypeName"):
+                if not isinstance(t.get(k), str):
+                    raise ValueError(f"timeAppointments.{k} ausente")
+        appointments += len(tas)
+    return len(body["actions"]), appointments
+
+def _make_handler(cfg: SimConfig, stats: SimStats, rng: random.Random):
+    rng_lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):  # silencioso: é usado sob carga
+            pass
+
+        def _send(self, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None,
+                  actions: int = 0, appointments: int = 0):
+            # cabeçalhos + corpo em um único write, evitando Nagle/ACK atrasado no keep-alive
+            lines = [f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}",
+                     "Content-Type: application/json",
+                     f"Content-Length: {len(body)}"]
+            lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+            # contabiliza antes de responder: o cliente pode ler as estatísticas logo após a resposta
+            stats.record(status, actions, appointments)
+            self.wfile.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+        def do_PATCH(self):
+            parts = urlsplit(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+
+            if parts.path.rstrip("/") != TICKETS_PATH:
+                return self._send(404, b'{"error":"not found"}')
+
+            with rng_lock:
+                delay = cfg.latency_ms + (rng.uniform(-cfg.jitter_ms, cfg.jitter_ms) if cfg.jitter_ms else 0)
+                roll = rng.random()
+            if delay > 0:
+                time.sleep(delay / 1000)
+
+            qs = parse_qs(parts.query)
+            if qs.get("token", [""])[0] != cfg.token or roll < cfg.p401:
+                return self._send(401, b'{"error":"unauthorized"}')
+            roll -= cfg.p401
+            if roll < cfg.p429:
+                return self._send(429, b'{"error":"too many requests"}',
+                                  {"Retry-After": str(cfg.retry_after)})
+            roll -= cfg.p429
+            if roll < cfg.p5xx:
+                return self._send(503, b'{"error":"service unavailable"}')
+            if not qs.get("id", [""])[0].isdigit():
+                return self._send(400, b'{"error":"id invalido"}')
+
+            try:
+                n_actions, n_apps = _validate_body(json.loads(raw or b"null"))
+            except ValueError as e:
+                return self._send(400, json.dumps({"error": str(e)}).encode())
+            self._send(200, b"{}", actions=n_actions, appointments=n_apps)
+
+    return Handler
+
+class _SimHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # o cliente sync abre uma conexão por chamada: com o backlog padrão (5) o listen
+    # transborda em c>=16 e a cauda passa a medir retransmissão de SYN, não o cliente
+    request_queue_size = 1024
+
+class MovideskSimulator:
+    """Servidor em thread; use como context manager nos benchmarks."""
+
+    def __init__(self, cfg: Optional[SimConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.cfg = cfg or SimConfig()
+        self.stats = SimStats()
+        rng = random.Random(self.cfg.seed)
+        self.httpd = _SimHTTPServer((host, port), _make_handler(self.cfg, self.stats, rng))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def api_base(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{TICKETS_PATH}"
+
+    def start(self) -> "MovideskSimulator":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def add_sim_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    ap.add_argument("--p401", type=float, default=0.0, help="fração de respostas 401")
+    ap.add_argument("--p429", type=float, default=0.0, help="fração de respostas 429")
+    ap.add_argument("--retry-after", type=int, default=1, help="segundos no cabeçalho Retry-After")
+    ap.add_argument("--p5xx", type=float, default=0.0, help="fração de respostas 503")
+    ap.add_argument("--seed", type=int, default=None)
+
+def sim_config_from_args(args: argparse.Namespace, token: str) -> SimConfig:
+    return SimConfig(token=token, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                     p401=args.p401, p429=args.p429, retry_after=args.retry_after,
+                     p5xx=args.p5xx, seed=args.seed)
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8900)
+    ap.add_argument("--token", default="sim-token")
+    add_sim_args(ap)
+    args = ap.parse_args(argv)
+
+    sim = MovideskSimulator(sim_config_from_args(args, args.token), args.host, args.port)
+    print(f"simulador em {sim.api_base} (token={args.token}); Ctrl+C para sair")
+    try:
+        sim.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.httpd.server_close()
+        print(json.dumps(sim.stats.snapshot(), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,26 @@
 # movidesk/api_client.py
+import time
+import asyncio
+import threading
 import requests
 from datetime import datetime
-from tkinter import messagebox  # mantido por compatibilidade com fluxos existentes
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+try:
+    from tkinter import messagebox  # mantido por compatibilidade com fluxos existentes
+except ImportError:  # servidor (gateway de apontamentos) roda sem Tk
+    messagebox = None
 from .validators import validate_date, validate_time, validate_ticket
 from .constants import API_BASE, ATIVIDADE, WORK_TYPE
-from .errors import AppError
+from .errors import AppError, ConfigError, MovideskHTTPError
+from .tracing import span
 
-def apontar_horas(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, agente_id, texts):
+# =========================
+# Validação e payload (compartilhados pelos caminhos sync e async)
+# =========================
+def _validate_entry(ticket_id, data_str, hora_inicio, hora_fim, texts) -> None:
     # Validações de entrada (mesmo padrão que você já usava)
     if not validate_ticket(ticket_id):
         raise AppError(texts.get("invalid_ticket", "Ticket inválido."))
@@ -15,11 +29,15 @@ def apontar_horas(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, ag
     if not (validate_time(hora_inicio) and validate_time(hora_fim)):
         raise AppError(texts.get("invalid_time", "Hora inválida."))
 
+def _require_token(cfg) -> str:
     # Garante token
     token = (cfg or {}).get("token", "").strip()
     if not token or token.lower().startswith("cole_aqui"):
-        raise AppError("Token do Movidesk ausente/placeholder. Configure no config central (ou via F10).")
+        raise ConfigError("Token do Movidesk ausente/placeholder. Configure no config central (ou via F10).")
+    return token
 
+def build_action(descricao, data_str, hora_inicio, hora_fim, agente_id, texts) -> Dict[str, Any]:
+    """Monta uma action de apontamento (type 2) no formato do PATCH /tickets."""
     # Montagem de datas/horas (idêntico ao seu código anterior)
     # data_str vem como "dd/MM/yyyy"
     try:
@@ -29,9 +47,30 @@ def apontar_horas(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, ag
     hora_inicio_iso = f"{hora_inicio}:00.0000000"
     hora_fim_iso    = f"{hora_fim}:00.0000000"
 
-    # URL base e params em vez de concatenar manualmente a query string
+    return {
+        "type": 2,
+        "description": descricao,
+        "createdBy": {"id": agente_id},
+        "timeAppointments": [
+            {
+                "activity": ATIVIDADE,
+                "date": data_iso,
+                "periodStart": hora_inicio_iso,
+                "periodEnd": hora_fim_iso,
+                "workTypeName": WORK_TYPE,
+                "createdBy": {"id": agente_id},
+            }
+        ],
+    }
+
+def build_request(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, agente_id,
+                  texts) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """Valida a entrada e devolve (params, payload) do PATCH; levanta AppError se inválida."""
+    _validate_entry(ticket_id, data_str, hora_inicio, hora_fim, texts)
+    token = _require_token(cfg)
+
+    # params em vez de concatenar manualmente a query string
     # Equivalente ao seu: f"{API_BASE}?token={cfg['token']}&id={ticket_id}"
-    url = f"{API_BASE}"
     params = {
         "token": token,
         "id": ticket_id
@@ -39,36 +78,196 @@ def apontar_horas(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, ag
 
     # Payload: exatamente o mesmo que você usava
     payload = {
-        "actions": [
-            {
-                "type": 2,
-                "description": descricao,
-                "createdBy": {"id": agente_id},
-                "timeAppointments": [
-                    {
-                        "activity": ATIVIDADE,
-                        "date": data_iso,
-                        "periodStart": hora_inicio_iso,
-                        "periodEnd": hora_fim_iso,
-                        "workTypeName": WORK_TYPE,
-                        "createdBy": {"id": agente_id},
-                    }
-                ],
-            }
-        ]
+        "actions": [build_action(descricao, data_str, hora_inicio, hora_fim, agente_id, texts)]
     }
+    return params, payload
 
-    headers = {"Content-Type": "application/json"}
+def _check_response(status: int, body: str, texts, retry_after: Optional[float] = None) -> bool:
+    if status == 200:
+        return True
+    elif status == 401:
+        raise MovideskHTTPError("401 não autorizado: verifique o token (valor e permissões) no config central.",
+                                status)
+    else:
+        raise MovideskHTTPError(texts.get("apontamento_fail", "Falha no apontamento (status {status}): {body}")
+                                .format(status=status, body=body), status, retry_after)
 
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # Movidesk manda segundos; datas HTTP são ignoradas (cai no backoff de quem chamou)
     try:
-        resp = requests.patch(url, params=params, headers=headers, json=payload, timeout=30)
-    except requests.RequestException as e:
-        raise AppError(texts.get("network_fail", "Falha de rede: {err}").format(err=e))
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
 
-    if resp.status_code == 200:
-        return True
-    elif resp.status_code == 401:
-        raise AppError("401 não autorizado: verifique o token (valor e permissões) no config central.")
-    else:
-        raise AppError(texts.get("apontamento_fail", "Falha no apontamento (status {status}): {body}")
-                       .format(status=resp.status_code, body=resp.text))
+# =========================
+# Cliente síncrono (usado pela UI)
+# =========================
+_conn_timing = threading.local()  # fases da última conexão aberta nesta thread, em ms
+
+class _ConnectTimer:
+    """Mixin das conexões do urllib3: separa DNS + TCP (_new_conn) do handshake TLS."""
+
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_s = time.perf_counter() - t0
+
+    def connect(self):
+        self._tcp_s = 0.0
+        t0 = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - t0
+        _conn_timing.connect_ms = self._tcp_s * 1000
+        _conn_timing.tls_ms = (total - self._tcp_s) * 1000
+
+class _TimedHTTPConnection(_ConnectTimer, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_ConnectTimer, HTTPSConnection):
+    pass
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+def apontar_horas(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim, agente_id, texts):
+    with span("api.validate"):
+        params, payload = build_request(cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim,
+                                        agente_id, texts)
+
+    url = f"{API_BASE}"
+    headers = {"Content-Type": "application/json"}
+
+    # ttfb_ms = connect_ms (DNS + TCP) + tls_ms + server_ms; o restante de dur_ms é
+    # leitura do corpo. Sessão por chamada, como requests.patch, com o adapter que mede a conexão.
+    _conn_timing.connect_ms = _conn_timing.tls_ms = None
+    with span("api.http", ticket=ticket_id) as sp:
+        try:
+            with requests.Session() as session:
+                session.mount("https://", _TimedAdapter())
+                session.mount("http://", _TimedAdapter())
+                resp = session.patch(url, params=params, headers=headers, json=payload, timeout=30)
+        except requests.RequestException as e:
+            raise AppError(texts.get("network_fail", "Falha de rede: {err}").format(err=e))
+        ttfb = resp.elapsed.total_seconds() * 1000
+        sp["status"] = resp.status_code
+        sp["ttfb_ms"] = f"{ttfb:.1f}"
+        if _conn_timing.connect_ms is not None:
+            sp["connect_ms"] = f"{_conn_timing.connect_ms:.1f}"
+            sp["tls_ms"] = f"{_conn_timing.tls_ms:.1f}"
+            sp["server_ms"] = f"{max(0.0, ttfb - _conn_timing.connect_ms - _conn_timing.tls_ms):.1f}"
+        sp["bytes"] = len(resp.content)
+
+    return _check_response(resp.status_code, resp.text, texts)
+
+
+# =========================
+# Cliente assíncrono (importações, flush de fila, proxy no servidor)
+# =========================
+class AsyncMovideskClient:
+    """
+    Contraparte asyncio de apontar_horas, com o mesmo payload (build_request).
+
+    - Concorrência limitada por semáforo (max_concurrency) e pool de conexões
+      keep-alive do httpx do mesmo tamanho, reaproveitado entre chamadas.
+    - Cancelamento: cancelar a task que aguarda apontar_horas/apontar_muitos
+      cancela as requisições em andamento; aclose() encerra o pool.
+    - max_rps (opcional) espaça as requisições; um 429 com Retry-After pausa
+      todas as chamadas deste cliente, não só a que recebeu o 429.
+
+    Uso:
+        async with AsyncMovideskClient(cfg, texts, max_concurrency=16) as cli:
+            resultados = await cli.apontar_muitos(entradas)
+
+    Requer httpx (pip install httpx); o app desktop não depende dele.
+    """
+
+    def __init__(self, cfg, texts=None, max_concurrency: int = 8, timeout: float = 30.0,
+                 base_url: Optional[str] = None, max_rps: Optional[float] = None):
+        try:
+            import httpx
+        except ImportError:
+            raise AppError("AsyncMovideskClient requer o pacote httpx (pip install httpx).")
+        self._httpx = httpx
+        self.cfg = cfg
+        self.texts = texts or {}
+        self.base_url = base_url or API_BASE
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._interval = 1.0 / max_rps if max_rps else 0.0
+        self._next_slot = 0.0
+        self._pace_lock = asyncio.Lock()
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency,
+                                max_keepalive_connections=max_concurrency),
+            headers={"Content-Type": "application/json"},
+        )
+
+    async def __aenter__(self) -> "AsyncMovideskClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def _pace(self) -> None:
+        """Reserva o próximo horário livre (max_rps e pausas de Retry-After) e espera por ele."""
+        loop = asyncio.get_running_loop()
+        async with self._pace_lock:
+            slot = max(loop.time(), self._next_slot)
+            self._next_slot = slot + self._interval
+        delay = slot - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _patch(self, params: Dict[str, str], payload: Dict[str, Any]) -> bool:
+        async with self._sem:
+            await self._pace()
+            with span("api.async.http", ticket=params.get("id")) as sp:
+                try:
+                    resp = await self._client.patch(self.base_url, params=params, json=payload)
+                except self._httpx.HTTPError as e:
+                    raise AppError(self.texts.get("network_fail", "Falha de rede: {err}").format(err=e))
+                sp["status"] = resp.status_code
+        retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+        if resp.status_code == 429 and retry_after:
+            self._next_slot = max(self._next_slot, asyncio.get_running_loop().time() + retry_after)
+        return _check_response(resp.status_code, resp.text, self.texts, retry_after)
+
+    async def apontar_horas(self, ticket_id, descricao, data_str, hora_inicio, hora_fim, agente_id) -> bool:
+        params, payload = build_request(self.cfg, ticket_id, descricao, data_str, hora_inicio, hora_fim,
+                                        agente_id, self.texts)
+        return await self._patch(params, payload)
+
+    async def apontar_acoes(self, ticket_id, actions: List[Dict[str, Any]]) -> bool:
+        """Envia actions já montadas (build_action) do mesmo ticket em um único PATCH."""
+        if not validate_ticket(ticket_id):
+            raise AppError(self.texts.get("invalid_ticket", "Ticket inválido."))
+        params = {"token": _require_token(self.cfg), "id": ticket_id}
+        return await self._patch(params, {"actions": list(actions)})
+
+    async def apontar_muitos(self, entradas: Iterable[Tuple], return_exceptions: bool = True) -> List[Any]:
+        """
+        Envia várias entradas (ticket_id, descricao, data_str, hora_inicio, hora_fim, agente_id)
+        respeitando max_concurrency. Devolve, na mesma ordem, True ou a exceção de cada uma
+        (ou propaga a primeira, se return_exceptions=False).
+        """
+        tasks = [asyncio.ensure_future(self.apontar_horas(*e)) for e in entradas]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        finally:
+            # sem return_exceptions, uma falha não pode deixar as demais rodando soltas
+            for t in tasks:
+                if not t.done():
+                    t.cancel()
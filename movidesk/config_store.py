@@ -1,11 +1,17 @@
 import os
 import sys
 import json
+import time
 from pathlib import Path
 from typing import Dict, Any, Tuple, Optional
 
 import requests
+try:  # opcional: formato compacto do /client-config
+    import msgpack
+except ImportError:
+    msgpack = None
 from .security import is_hashed, hash_password
+from .tracing import setup_tracing, span
 
 APP_NAME = "MovideskApp"
 
@@ -20,6 +26,9 @@ REMOTE_CACHE = _user_config_dir() / "remote_config.cache.json"
 ADMIN_KEY_FILE = _user_config_dir() / "admin.key"  # preferencial
 ADMIN_KEY_SIDECAR: Optional[Path] = None  # definido em runtime
 
+# spans de desempenho em %APPDATA%/MovideskApp/trace.log (rotativo)
+setup_tracing(_user_config_dir())
+
 DEFAULT_CONFIG: Dict[str, Any] = {
     "usuarios": {"admin": {"senha": "", "agent_id": "", "admin": True}},
     "token": "",
@@ -55,12 +64,38 @@ def _read_backend_json() -> Dict[str, Any]:
     except Exception:
         return {}
 
+REMOTE_429_RETRIES = 2  # novas tentativas quando o backend responde 429
+REMOTE_429_MAX_WAIT = 10.0  # teto (s) para o Retry-After; acima disso usa o cache
+
+def _retry_after(r: "requests.Response") -> Optional[float]:
+    try:
+        return max(0.0, float(r.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
 def _fetch_remote(url: str, timeout=8) -> Tuple[Dict[str, Any], bool]:
-    """Busca config remoto; em sucesso salva cache. Em falha, tenta cache."""
+    """
+    Busca config remoto; em sucesso salva cache. Em falha, tenta cache.
+
+    O backend limita GET /client-config por IP, e uma filial atrás de NAT divide
+    um só IP. Num 429, espera o Retry-After (até REMOTE_429_MAX_WAIT) e tenta de
+    novo até REMOTE_429_RETRIES vezes; se não der, cai no cache como nas
+    demais falhas.
+    """
+    # pede msgpack quando disponível; gzip/br são negociados pelo próprio requests
+    accept = "application/msgpack, application/json;q=0.9" if msgpack else "application/json"
     try:
-        r = requests.get(url, timeout=timeout)
+        for attempt in range(REMOTE_429_RETRIES + 1):
+            r = requests.get(url, headers={"Accept": accept}, timeout=timeout)
+            wait = _retry_after(r) if r.status_code == 429 else None
+            if wait is None or wait > REMOTE_429_MAX_WAIT or attempt == REMOTE_429_RETRIES:
+                break
+            time.sleep(wait)
         r.raise_for_status()
-        data = r.json()
+        if msgpack and r.headers.get("Content-Type", "").startswith("application/msgpack"):
+            data = msgpack.unpackb(r.content, raw=False)
+        else:
+            data = r.json()
         REMOTE_CACHE.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
         return data, True
     except Exception:
@@ -92,23 +127,28 @@ def load_config() -> Dict[str, Any]:
     ADMIN_KEY_SIDECAR = _exe_dir() / "admin_key.txt"
 
     # base local
-    if CONFIG_FILE.exists():
-        try:
-            cfg = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
-        except Exception:
+    with span("config.local_read"):
+        if CONFIG_FILE.exists():
+            try:
+                cfg = json.loads(CONFIG_FILE.read_text(encoding="utf-8"))
+            except Exception:
+                cfg = DEFAULT_CONFIG.copy()
+        else:
             cfg = DEFAULT_CONFIG.copy()
-    else:
-        cfg = DEFAULT_CONFIG.copy()
-        save_config(cfg)  # cria arquivo local
+            save_config(cfg)  # cria arquivo local
 
-    _ensure_minimum(cfg)
-    if _migrate_passwords(cfg):
-        _save_local(cfg)
+    with span("config.migrate") as sp:
+        _ensure_minimum(cfg)
+        sp["changed"] = _migrate_passwords(cfg)
+        if sp["changed"]:
+            _save_local(cfg)
 
     # remoto (se backend.json definir)
     remote_url = (_read_backend_json().get("remote_config_url") or "").strip()
     if remote_url:
-        remote_cfg, ok = _fetch_remote(remote_url)
+        with span("config.remote_fetch") as sp:
+            remote_cfg, ok = _fetch_remote(remote_url)
+            sp["ok"] = ok
         if ok and isinstance(remote_cfg, dict):
             cfg = _overlay(cfg, remote_cfg)
             _ensure_minimum(cfg)
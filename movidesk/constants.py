@@ -7,7 +7,9 @@ APP_DIR = Path(__file__).resolve().parent
 CONFIG_FILE = APP_DIR / "config.json"
 
 # ===== API & App Constants =====
-API_BASE = "https://api.movidesk.com/public/v1/tickets"
+# ENV_API_BASE permite apontar para o simulador local (bench/movidesk_sim.py)
+ENV_API_BASE = "MOVIDESK_API_BASE"
+API_BASE = os.getenv(ENV_API_BASE, "https://api.movidesk.com/public/v1/tickets")
 ATIVIDADE = "AMS Sustentacao"
 WORK_TYPE = "normal"
 
@@ -1,5 +1,16 @@
+from typing import Optional
 
 class AppError(Exception):
     def __init__(self, message: str):
         super().__init__(message)
         self.user_message = message
+
+class ConfigError(AppError):
+    """Configuração ausente/inválida (ex.: token do Movidesk): problema do ambiente, não da entrada."""
+
+class MovideskHTTPError(AppError):
+    """Resposta != 200 da API do Movidesk; status e Retry-After (s) para quem precisa decidir retry."""
+    def __init__(self, message: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
@@ -1,7 +1,39 @@
-
 # Entrypoint that keeps the original app behavior/structure,
 # but sources logic from organized modules.
-from movidesk.ui_main import App
+import sys
+import argparse
 
-if __name__ == "__main__":
+def _run():
+    # import tardio: ui_main carrega o config no import, e isso entra no profile
+    from movidesk.ui_main import App
     App().mainloop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="MovideskApp")
+    parser.add_argument("--profile", action="store_true",
+                        help="grava estatísticas do cProfile da sessão em %%APPDATA%%/MovideskApp")
+    args, _ = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+
+    if not args.profile:
+        _run()
+        return
+
+    import cProfile
+    import pstats
+    from datetime import datetime
+    from movidesk.config_store import _user_config_dir
+
+    out = _user_config_dir() / f"profile-{datetime.now():%Y%m%d-%H%M%S}.prof"
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        _run()
+    finally:
+        prof.disable()
+        prof.dump_stats(str(out))
+        # resumo legível ao lado do .prof (o .exe roda sem console)
+        with open(out.with_suffix(".txt"), "w", encoding="utf-8") as f:
+            pstats.Stats(prof, stream=f).sort_stats("cumulative").print_stats(40)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# movidesk/tracing.py
+import time
+import logging
+import functools
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+TRACE_LOG_NAME = "trace.log"
+TRACE_MAX_BYTES = 512 * 1024
+TRACE_BACKUPS = 3
+
+_logger = logging.getLogger("movidesk.trace")
+_logger.propagate = False
+_configured = False
+
+def setup_tracing(log_dir: Path) -> Optional[Path]:
+    """Liga o log rotativo de spans em log_dir/trace.log. Chamadas repetidas são ignoradas."""
+    global _configured
+    if _configured:
+        return None
+    _configured = True
+    path = Path(log_dir) / TRACE_LOG_NAME
+    try:
+        handler = RotatingFileHandler(path, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8")
+    except OSError:
+        # Sem permissão de escrita: tracing nunca pode derrubar o app
+        _logger.addHandler(logging.NullHandler())
+        return None
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    return path
+
+def _fmt(fields) -> str:
+    return " ".join(f"{k}={v}" for k, v in fields.items())
+
+@contextmanager
+def span(name: str, **fields):
+    """
+    Mede a duração de um trecho e grava uma linha no trace.log:
+        span=api.http dur_ms=812.3 status=200
+    O dict devolvido aceita campos extras durante o trecho (ex.: status HTTP).
+    Exceções são registradas com error=<Tipo> e repropagadas.
+    """
+    t0 = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields["error"] = type(e).__name__
+        raise
+    finally:
+        if _logger.handlers:
+            msg = f"span={name} dur_ms={(time.perf_counter() - t0) * 1000:.1f}"
+            if fields:
+                msg += " " + _fmt(fields)
+            _logger.info(msg)
+
+def traced(name: str):
+    """Decorator para callbacks de UI: envolve a chamada inteira em um span."""
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
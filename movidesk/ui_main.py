@@ -8,6 +8,7 @@ from .config_store import load_config, save_config
 from .security import verify_password, hash_password, is_hashed
 from .api_client import apontar_horas
 from .i18n import TEXTS as T
+from .tracing import span, traced
 
 config = load_config()
 
@@ -45,6 +46,7 @@ class App(tb.Window):
     def open_admin(self):
         AdminWindow(self, on_change=lambda: self.main_page.refresh_admin_state())
 
+    @traced("ui.toggle_theme")
     def toggle_theme(self):
         atual = self.style.theme.name
         self.style.theme_use("darkly" if atual != "darkly" else "flatly")
@@ -88,7 +90,9 @@ class LoginPage(tb.Frame):
         usuario = self.user_entry.get().strip()
         senha = self.pass_entry.get().strip()
         user = config.get("usuarios", {}).get(usuario)
-        if user and verify_password(user.get("senha", ""), senha):
+        with span("ui.login") as sp:
+            sp["ok"] = bool(user and verify_password(user.get("senha", ""), senha))
+        if sp["ok"]:
             self.on_login(usuario)
         else:
             messagebox.showerror(T["err"], T["invalid_login"])
@@ -166,17 +170,21 @@ class MainPage(tb.Frame):
             messagebox.showerror(T["err"], T["no_agent"]); return
 
         self._set_loading(True)
+        # força o redesenho do botão antes da chamada bloqueante
+        with span("ui.redraw"):
+            self.update_idletasks()
         try:
-            ok = apontar_horas(
-                config,
-                self.ticket_id.get().strip(),
-                self.descricao.get().strip(),
-                self.data.get().strip(),
-                self.hora_ini.get().strip(),
-                self.hora_fim.get().strip(),
-                agent_id,
-                T
-            )
+            with span("ui.apontar"):
+                ok = apontar_horas(
+                    config,
+                    self.ticket_id.get().strip(),
+                    self.descricao.get().strip(),
+                    self.data.get().strip(),
+                    self.hora_ini.get().strip(),
+                    self.hora_fim.get().strip(),
+                    agent_id,
+                    T
+                )
             if ok:
                 messagebox.showinfo(T["ok"], T["apontamento_ok"])
         except Exception as e:
@@ -232,6 +240,7 @@ class AdminWindow(tb.Toplevel):
         e.pack(side=LEFT)
         return e
 
+    @traced("ui.load_tree")
     def _load_tree(self):
         for i in self.tree.get_children():
             self.tree.delete(i)
@@ -267,11 +276,12 @@ class AdminWindow(tb.Toplevel):
         # Hash if needed
         if not isinstance(senha, str) or not senha:
             messagebox.showerror(T["err"], T["inform_pass"]); return
-        if not senha.startswith("sha256$"):
-            senha = hash_password(senha)
+        with span("ui.salvar"):
+            if not senha.startswith("sha256$"):
+                senha = hash_password(senha)
 
-        config["usuarios"][nome] = {"senha": senha, "agent_id": agent, "admin": is_admin}
-        save_config(config)
+            config["usuarios"][nome] = {"senha": senha, "agent_id": agent, "admin": is_admin}
+            save_config(config)
         self._load_tree()
         if self.on_change: self.on_change()
         messagebox.showinfo(T["ok"], T["user_saved"])
@@ -284,8 +294,9 @@ class AdminWindow(tb.Toplevel):
         if nome == "admin":
             messagebox.showerror(T["err"], T["no_remove_admin"]); return
         if messagebox.askyesno(T["ok"], T["confirm_remove"].format(name=nome)):
-            config["usuarios"].pop(nome, None)
-            save_config(config)
+            with span("ui.remover"):
+                config["usuarios"].pop(nome, None)
+                save_config(config)
             self._load_tree()
             if self.on_change: self.on_change()
             messagebox.showinfo(T["ok"], T["user_removed"])
@@ -1,12 +1,36 @@
 import os
+import gzip
+import hmac
+import math
 import json
+import time
+import queue
+import asyncio
 import sqlite3
-from threading import Lock
-from typing import List, Optional, Dict, Any
+import logging
+import unicodedata
+import uuid
+from contextlib import asynccontextmanager
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Event, Lock, Thread, current_thread
+from typing import List, Optional, Dict, Any, Tuple
 
-from fastapi import FastAPI, Header, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+
+try:  # opcionais: sem eles, só JSON e gzip
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from movidesk.api_client import AsyncMovideskClient, build_request
+from movidesk.errors import AppError, ConfigError, MovideskHTTPError
 
 # =========================
 # Configurações do servidor
@@ -14,9 +38,45 @@ from pydantic import BaseModel
 DB_PATH = os.getenv("DB_PATH", "usuarios.db")
 CONFIG_PATH = os.getenv("CLIENT_CONFIG_PATH", "client-config.json")  # ex.: /data/client-config.json se usar Volume
 CONFIG_ADMIN_KEY = os.getenv("CONFIG_ADMIN_KEY", "")  # defina no Railway → Variables
+USERS_BATCH_WINDOW_MS = float(os.getenv("USERS_BATCH_WINDOW_MS", "2"))  # janela do group commit
+USERS_BATCH_MAX = int(os.getenv("USERS_BATCH_MAX", "256"))  # máx. de inserts por transação
+USERS_FTS = os.getenv("USERS_FTS", "1") == "1"  # busca full-text (FTS5) em GET /usuarios?q=, se o SQLite tiver
+USERS_SEARCH_SCAN = os.getenv("USERS_SEARCH_SCAN", "0") == "1"  # sem FTS5: busca por trecho (varre a tabela)
+# Gateway de apontamentos (POST /apontamentos → Movidesk)
+APONT_RPS = float(os.getenv("APONT_RPS", "5"))  # orçamento de requisições/s ao Movidesk (todas as estações)
+APONT_CONCURRENCY = int(os.getenv("APONT_CONCURRENCY", "4"))  # PATCHes simultâneos / conexões no pool
+APONT_WINDOW_MS = float(os.getenv("APONT_WINDOW_MS", "500"))  # espera para juntar entradas do mesmo ticket
+APONT_MAX_ACTIONS = int(os.getenv("APONT_MAX_ACTIONS", "20"))  # máx. de apontamentos por PATCH
+APONT_MAX_ATTEMPTS = int(os.getenv("APONT_MAX_ATTEMPTS", "8"))  # depois disso a entrada fica "failed"
+APONT_LEASE_S = float(os.getenv("APONT_LEASE_S", "300"))  # validade do claim; maior que a duração de um ciclo
+APONT_MAX_QUEUE = int(os.getenv("APONT_MAX_QUEUE", "10000"))  # acima disso POST /apontamentos devolve 503
+APONT_POST_RATE = float(os.getenv("APONT_POST_RATE", "2"))  # fichas/s por cliente em POST /apontamentos
+APONT_POST_BURST = float(os.getenv("APONT_POST_BURST", "60"))
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))  # abaixo disso não compensa comprimir
+# Throttling por cliente (IP ou X-Config-Key válida) em /client-config; rate 0 desliga.
+# O GET é folgado porque uma filial inteira atrás de NAT divide um IP e todos os
+# desktops leem o config ao abrir; quem toma 429 espera o Retry-After (config_store).
+CONFIG_GET_RATE = float(os.getenv("CONFIG_GET_RATE", "5"))  # fichas/s
+CONFIG_GET_BURST = float(os.getenv("CONFIG_GET_BURST", "120"))
+CONFIG_PUT_RATE = float(os.getenv("CONFIG_PUT_RATE", "0.2"))
+CONFIG_PUT_BURST = float(os.getenv("CONFIG_PUT_BURST", "5"))
 _config_lock = Lock()
+_schema_lock = Lock()
+_schema_ready = False
+_fts_enabled = False
+logger = logging.getLogger("uvicorn.error")
 
-app = FastAPI(title="Minha API LAN", docs_url="/", redoc_url=None)
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    # threads de fundo: gateway de apontamentos e escritor de usuarios
+    await asyncio.to_thread(_gateway.start)
+    try:
+        yield
+    finally:
+        await asyncio.to_thread(_gateway.stop)
+        await asyncio.to_thread(_user_writer.stop)
+
+app = FastAPI(title="Minha API LAN", docs_url="/", redoc_url=None, lifespan=_lifespan)
 
 # =========================
 # Camada de dados (SQLite)
@@ -31,8 +91,287 @@ def get_db():
         )
         """
     )
+    global _schema_ready
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                _migrate(conn)
+                _schema_ready = True
     return conn
 
+def _norm(s: str) -> str:
+    """Forma de busca: sem acentos e sem caixa ("João" -> "joao")."""
+    decomposed = unicodedata.normalize("NFKD", s or "")
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """
+    Migração idempotente, roda uma vez por processo no primeiro get_db():
+    - coluna nome_norm (nome sem acento/caixa) + índice para busca por prefixo;
+    - preenche nome_norm de linhas antigas ou inseridas por fora da API;
+    - com USERS_FTS=1, tabela FTS5 externa (content=usuarios) mantida por triggers;
+    - fila durável do gateway de apontamentos.
+    """
+    global _fts_enabled
+    conn.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS apontamentos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id TEXT NOT NULL,
+            action_json TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at REAL NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_apontamentos_fila ON apontamentos(status, next_attempt_at);
+        """
+    )
+    ap_cols = {r[1] for r in conn.execute("PRAGMA table_info(apontamentos)")}
+    if "lease_owner" not in ap_cols:
+        conn.execute("ALTER TABLE apontamentos ADD COLUMN lease_owner TEXT")
+        conn.execute("ALTER TABLE apontamentos ADD COLUMN lease_until REAL NOT NULL DEFAULT 0")
+    cols = {r[1] for r in conn.execute("PRAGMA table_info(usuarios)")}
+    if "nome_norm" not in cols:
+        conn.execute("ALTER TABLE usuarios ADD COLUMN nome_norm TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_usuarios_nome_norm ON usuarios(nome_norm)")
+    while True:
+        rows = conn.execute("SELECT id, nome FROM usuarios WHERE nome_norm IS NULL LIMIT 5000").fetchall()
+        if not rows:
+            break
+        conn.executemany("UPDATE usuarios SET nome_norm = ? WHERE id = ?", [(_norm(n), i) for i, n in rows])
+        conn.commit()
+
+    if USERS_FTS:
+        conn.commit()
+        try:
+            # tabela, triggers e rebuild numa transação só: um rebuild que falha
+            # (ex.: banco travado por outro worker) não deixa o índice criado e vazio
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS usuarios_fts USING fts5("
+                "nome, content='usuarios', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+            )
+            for ddl in _FTS_TRIGGERS:
+                conn.execute(ddl)
+            # fora de sincronia (tabela recém-criada ou índice de uma versão que falhou no meio):
+            # usuarios_fts_docsize tem uma linha por documento indexado
+            indexed = conn.execute("SELECT COUNT(*) FROM usuarios_fts_docsize").fetchone()[0]
+            total = conn.execute("SELECT COUNT(*) FROM usuarios").fetchone()[0]
+            if indexed != total:
+                conn.execute("INSERT INTO usuarios_fts(usuarios_fts) VALUES ('rebuild')")
+            conn.commit()
+            _fts_enabled = True
+        except sqlite3.OperationalError:
+            # SQLite sem FTS5 (ou antigo demais para remove_diacritics 2) ou banco travado:
+            # segue só com o índice; a próxima inicialização tenta de novo
+            conn.rollback()
+            _fts_enabled = False
+    conn.commit()
+
+_FTS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS usuarios_fts_ai AFTER INSERT ON usuarios BEGIN
+        INSERT INTO usuarios_fts(rowid, nome) VALUES (new.id, new.nome);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS usuarios_fts_ad AFTER DELETE ON usuarios BEGIN
+        INSERT INTO usuarios_fts(usuarios_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS usuarios_fts_au AFTER UPDATE OF nome ON usuarios BEGIN
+        INSERT INTO usuarios_fts(usuarios_fts, rowid, nome) VALUES ('delete', old.id, old.nome);
+        INSERT INTO usuarios_fts(rowid, nome) VALUES (new.id, new.nome);
+    END""",
+)
+
+def _buscar_usuarios(conn: sqlite3.Connection, q: str, limit: int) -> List[Dict[str, Any]]:
+    """
+    Busca ranqueada por nome, sem acento/caixa:
+      0. nome exato;
+      1. prefixo do nome (faixa no índice idx_usuarios_nome_norm);
+      2. prefixo de qualquer palavra via FTS5 (ordem do bm25) ou, sem FTS5 e com
+         USERS_SEARCH_SCAN=1, trecho do nome (varredura da tabela inteira).
+    Nos níveis 0 e 1, nomes mais curtos primeiro.
+    """
+    qn = _norm(q).strip()
+    if not qn:
+        return []
+    found: Dict[int, Tuple[int, float, int, str, str]] = {}  # id -> (nível, bm25, len, norm, nome)
+
+    rows = conn.execute(
+        "SELECT id, nome, nome_norm FROM usuarios WHERE nome_norm >= ? AND nome_norm < ? "
+        "ORDER BY nome_norm LIMIT ?",  # ordem do índice: para no LIMIT sem ordenar a faixa toda
+        (qn, qn + "\U0010ffff", limit),
+    ).fetchall()
+    for i, nome, nn in rows:
+        found[i] = (0 if nn == qn else 1, 0.0, len(nn), nn, nome)
+
+    if len(found) < limit:
+        if _fts_enabled:
+            tokens = [t for t in "".join(c if c.isalnum() else " " for c in qn).split() if t]
+            if tokens:
+                match = " AND ".join('"' + t.replace('"', '""') + '"*' for t in tokens)
+                rows = conn.execute(
+                    "SELECT u.id, u.nome, u.nome_norm, bm25(usuarios_fts) FROM usuarios_fts f "
+                    "JOIN usuarios u ON u.id = f.rowid "
+                    "WHERE usuarios_fts MATCH ? ORDER BY bm25(usuarios_fts) LIMIT ?",
+                    (match, limit + len(found)),
+                ).fetchall()
+            else:
+                rows = []
+        elif USERS_SEARCH_SCAN:
+            rows = conn.execute(
+                "SELECT id, nome, nome_norm, 0.0 FROM usuarios WHERE instr(nome_norm, ?) > 0 LIMIT ?",
+                (qn, limit + len(found)),
+            ).fetchall()
+        else:
+            rows = []
+        for i, nome, nn, score in rows:
+            found.setdefault(i, (2, score, len(nn or ""), nn or "", nome))
+
+    ranked = sorted(found.items(), key=lambda kv: kv[1][:4])[:limit]
+    return [{"id": i, "nome": v[4]} for i, v in ranked]
+
+class _UserWriter:
+    """
+    Escritor único da tabela usuarios (group commit).
+
+    Requisições concorrentes de POST /usuarios entram em uma fila; uma thread
+    dedicada pega o primeiro item, espera até USERS_BATCH_WINDOW_MS (ou até
+    USERS_BATCH_MAX itens) por outros e grava todos em UMA transação, pagando
+    um fsync por lote em vez de um por usuário. Cada requisição recebe o id
+    da sua linha. Com janela 0 o lote é só o que já estiver na fila.
+
+    Semântica em caso de queda:
+    - a resposta só sai depois do COMMIT do lote: id devolvido = linha durável;
+    - queda antes do COMMIT: o lote inteiro se perde (atomicidade do SQLite) e
+      os clientes não recebem resposta; podem reenviar com segurança;
+    - queda entre o COMMIT e a resposta: as linhas existem, mas o cliente vê
+      erro de conexão; reenviar cria duplicata (não há chave de idempotência);
+    - shutdown normal: a fila é drenada e gravada antes de encerrar.
+    Se o lote falhar, cada item é regravado sozinho para isolar o culpado.
+    Requisições canceladas antes da gravação (ex.: timeout do shutdown do
+    uvicorn) são descartadas; um erro inesperado falha só o próprio lote, e se
+    a thread morrer mesmo assim, o próximo submit sobe outra.
+    """
+
+    def __init__(self, window_ms: float, max_batch: int):
+        self.window_s = max(0.0, window_ms) / 1000
+        self.max_batch = max(1, max_batch)
+        self._q: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._thread: Optional[Thread] = None
+        self._lock = Lock()
+
+    def submit(self, nome: str) -> Future:
+        fut: Future = Future()
+        # enfileira sob o lock: quem encerra a thread confere a fila sob o mesmo lock
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = Thread(target=self._run, name="usuarios-writer", daemon=True)
+                self._thread.start()
+            self._q.put((nome, fut))
+        return fut
+
+    def stop(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._q.put(None)
+            thread.join()
+
+    def _collect(self, first) -> Tuple[list, bool]:
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    @staticmethod
+    def _claim(batch: list) -> list:
+        # marca como "running"; futures já canceladas (requisição abandonada) saem do lote
+        return [item for item in batch if item[1].set_running_or_notify_cancel()]
+
+    def _flush(self, conn: sqlite3.Connection, batch: list) -> None:
+        batch = self._claim(batch)
+        if not batch:
+            return
+        try:
+            self._write(conn, batch)
+        except Exception as e:
+            # nada pode derrubar o escritor: falha só quem ainda não tem resposta
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+
+    def _write(self, conn: sqlite3.Connection, batch: list) -> None:
+        cur = conn.cursor()
+        try:
+            ids = []
+            for nome, _ in batch:
+                cur.execute("INSERT INTO usuarios (nome, nome_norm) VALUES (?, ?)", (nome, _norm(nome)))
+                ids.append(cur.lastrowid)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+            for item in batch:
+                self._write(conn, [item])
+            return
+        for (_, fut), user_id in zip(batch, ids):
+            fut.set_result(user_id)
+
+    def _run(self) -> None:
+        try:
+            conn = get_db()
+        except Exception as e:
+            # sem banco: falha o que está na fila em vez de deixar requisições penduradas
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    with self._lock:
+                        # um submit pode ter visto esta thread viva e enfileirado depois do
+                        # último get: só sai com a fila vazia, e o próximo submit sobe outra
+                        if self._q.empty():
+                            if self._thread is current_thread():
+                                self._thread = None
+                            return
+                    continue
+                if item is not None:
+                    for _, fut in self._claim([item]):
+                        fut.set_exception(e)
+        try:
+            while True:
+                first = self._q.get()
+                if first is None:
+                    break
+                batch, stop = self._collect(first)
+                self._flush(conn, batch)
+                if stop:
+                    break
+            # drena o que chegou junto com o pedido de parada
+            while True:
+                try:
+                    item = self._q.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    self._flush(conn, [item])
+        finally:
+            conn.close()
+
+_user_writer = _UserWriter(USERS_BATCH_WINDOW_MS, USERS_BATCH_MAX)
+
 class UsuarioIn(BaseModel):
     nome: str
 
@@ -40,6 +379,66 @@ class UsuarioOut(BaseModel):
     id: int
     nome: str
 
+# =========================
+# Negociação de formato/compressão (GET /client-config e GET /usuarios)
+# =========================
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+def _qvalue(header: str, token: str) -> Optional[float]:
+    """q de `token` no Accept/Accept-Encoding (1.0 sem parâmetro q); None se não aparece."""
+    for part in (header or "").lower().split(","):
+        name, *params = part.split(";")
+        if name.strip() != token:
+            continue
+        for p in params:
+            k, _, v = p.strip().partition("=")
+            if k.strip() == "q":
+                try:
+                    return float(v)
+                except ValueError:
+                    return 0.0
+        return 1.0
+    return None
+
+def _accepts(header: str, token: str) -> bool:
+    """True se `token` aparece no Accept/Accept-Encoding com q > 0."""
+    return (_qvalue(header, token) or 0.0) > 0
+
+def _prefers_msgpack(accept: str) -> bool:
+    """msgpack só quando o Accept lhe dá q maior que o de JSON; no empate fica JSON."""
+    q_mp = max((_qvalue(accept, t) or 0.0 for t in MSGPACK_TYPES), default=0.0)
+    if q_mp <= 0:
+        return False
+    # JSON vale pela entrada mais específica que o cobre (application/json > application/* > */*)
+    for t in ("application/json", "application/*", "*/*"):
+        q_json = _qvalue(accept, t)
+        if q_json is not None:
+            return q_mp > q_json
+    return True
+
+def _negotiated(request: Request, data: Any) -> Response:
+    """
+    Serializa `data` conforme o Accept (msgpack se instalado e com q maior que o
+    de JSON; senão JSON minificado) e comprime conforme o Accept-Encoding (br > gzip) quando o corpo
+    passa de COMPRESS_MIN_BYTES.
+    """
+    if msgpack is not None and _prefers_msgpack(request.headers.get("accept", "")):
+        body, media_type = msgpack.packb(data, use_bin_type=True), MSGPACK_TYPES[0]
+    else:
+        body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        media_type = "application/json"
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        enc = request.headers.get("accept-encoding", "")
+        if brotli is not None and _accepts(enc, "br"):
+            body = brotli.compress(body, quality=5)  # q5: boa taxa sem custo alto de CPU por requisição
+            headers["Content-Encoding"] = "br"
+        elif _accepts(enc, "gzip"):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type=media_type, headers=headers)
+
 # =========================
 # Rotas de exemplo (usuarios)
 # =========================
@@ -48,23 +447,28 @@ def health():
     return {"status": "ok"}
 
 @app.post("/usuarios", response_model=UsuarioOut)
-def criar_usuario(usuario: UsuarioIn):
-    conn = get_db()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO usuarios (nome) VALUES (?)", (usuario.nome,))
-    conn.commit()
-    user_id = cur.lastrowid
-    conn.close()
+async def criar_usuario(usuario: UsuarioIn):
+    # async: a espera pelo lote não ocupa uma thread do pool por requisição
+    user_id = await asyncio.wrap_future(_user_writer.submit(usuario.nome))
     return {"id": user_id, "nome": usuario.nome}
 
 @app.get("/usuarios", response_model=List[UsuarioOut])
-def listar_usuarios():
+def listar_usuarios(
+    request: Request,
+    q: Optional[str] = Query(default=None, description="busca por nome (sem acento/caixa), ranqueada"),
+    limit: int = Query(default=50, ge=1, le=500, description="máximo de resultados da busca"),
+):
     conn = get_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, nome FROM usuarios")
-    rows = cur.fetchall()
-    conn.close()
-    return [{"id": r[0], "nome": r[1]} for r in rows]
+    try:
+        if q is not None:
+            return _negotiated(request, _buscar_usuarios(conn, q, limit))
+        # sem q: tabela inteira, como antes
+        cur = conn.cursor()
+        cur.execute("SELECT id, nome FROM usuarios")
+        rows = cur.fetchall()
+    finally:
+        conn.close()
+    return _negotiated(request, [{"id": r[0], "nome": r[1]} for r in rows])
 
 # =========================
 # Config central GET/PUT
@@ -87,11 +491,121 @@ def _save_central_config(data: Dict[str, Any]) -> None:
     with open(CONFIG_PATH, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+class _SingleFlight:
+    """
+    Chamadas concorrentes de do(fn) compartilham uma única execução: a primeira
+    roda fn, as que chegam enquanto ela roda esperam e recebem o mesmo resultado
+    (ou a mesma exceção). Não é cache: terminada a execução, a próxima chamada
+    roda fn de novo.
+    """
+
+    class _Call:
+        def __init__(self):
+            self.done = Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self):
+        self._lock = Lock()
+        self._call: Optional["_SingleFlight._Call"] = None
+
+    def do(self, fn):
+        with self._lock:
+            call, leader = self._call, self._call is None
+            if leader:
+                call = self._call = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._call = None
+            call.done.set()
+        return call.result
+
+_config_flight = _SingleFlight()
+
+def _read_central_config() -> Dict[str, Any]:
+    """Leitura do config central com coalescing; o dict devolvido é compartilhado, não altere."""
+    def load():
+        with _config_lock:
+            return _load_central_config()
+    return _config_flight.do(load)
+
+class _TokenBucketLimiter:
+    """Token bucket por chave: `rate` fichas/s, até `burst` acumuladas. rate <= 0 desliga."""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        # chave -> (fichas, último acesso), da menos para a mais recente
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def acquire(self, key: str) -> float:
+        """Consome uma ficha; devolve 0 se liberado ou os segundos até a próxima ficha."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1 if wait == 0 else tokens, now)
+            self._buckets.move_to_end(key)
+            self._prune(now)
+        return wait
+
+    def _prune(self, now: float) -> None:
+        # só olha o início (menos recentes): baldes que já teriam enchido de novo
+        # equivalem a não existir; acima de max_keys sai o menos recente (LRU)
+        full_after = self.burst / self.rate
+        while self._buckets:
+            _, last = next(iter(self._buckets.values()))
+            if now - last < full_after and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+_get_limiter = _TokenBucketLimiter(CONFIG_GET_RATE, CONFIG_GET_BURST)
+_put_limiter = _TokenBucketLimiter(CONFIG_PUT_RATE, CONFIG_PUT_BURST)
+_apont_limiter = _TokenBucketLimiter(APONT_POST_RATE, APONT_POST_BURST)
+
+def _is_admin_key(key: Optional[str]) -> bool:
+    return bool(CONFIG_ADMIN_KEY) and key is not None and hmac.compare_digest(key, CONFIG_ADMIN_KEY)
+
+def _throttle(limiter: _TokenBucketLimiter, request: Request, x_config_key: Optional[str]) -> None:
+    """
+    429 + Retry-After quando o cliente estoura o balde. A chave é a X-Config-Key
+    só se for válida (uma chave inventada por requisição não pode furar o limite);
+    senão o IP. Atrás de proxy, o uvicorn roda com --proxy-headers e confia só
+    nos IPs de FORWARDED_ALLOW_IPS (ver Procfile): o IP usado é o último salto
+    não confiável do X-Forwarded-For, que o cliente não consegue forjar. Com
+    '*' valeria o primeiro da lista, escolhido pelo próprio cliente.
+    """
+    if _is_admin_key(x_config_key):
+        key = "key:admin"
+    else:
+        key = "ip:" + (request.client.host if request.client else "?")
+    wait = limiter.acquire(key)
+    if wait > 0:
+        raise HTTPException(status_code=429, detail="too many requests",
+                            headers={"Retry-After": str(max(1, math.ceil(wait)))})
+
 @app.get("/client-config")
-def get_client_config():
-    with _config_lock:
-        data = _load_central_config()
-    return JSONResponse(content=data)
+def get_client_config(
+    request: Request,
+    x_config_key: Optional[str] = Header(default=None),
+):
+    _throttle(_get_limiter, request, x_config_key)
+    return _negotiated(request, _read_central_config())
 
 class ClientConfigIn(BaseModel):
     version: Optional[int] = None
@@ -125,11 +639,13 @@ def _secure_merge(base: Dict[str, Any], inc: Dict[str, Any]) -> Dict[str, Any]:
 
 @app.put("/client-config")
 def put_client_config(
+    request: Request,
     payload: ClientConfigIn,
-    x_config_key: Optional[str] = Header(default=None, convert_underscores=False),
+    x_config_key: Optional[str] = Header(default=None),  # lido do cabeçalho X-Config-Key
 ):
+    _throttle(_put_limiter, request, x_config_key)
     # Proteção simples por chave
-    if not CONFIG_ADMIN_KEY or x_config_key != CONFIG_ADMIN_KEY:
+    if not _is_admin_key(x_config_key):
         raise HTTPException(status_code=401, detail="unauthorized")
 
     with _config_lock:
@@ -146,6 +662,286 @@ def put_client_config(
         }
     )
 
+# =========================
+# Gateway de apontamentos (fila durável → Movidesk)
+# =========================
+class _ApontamentoGateway:
+    """
+    Encaminha a fila `apontamentos` ao Movidesk por um único cliente assíncrono
+    (pool de APONT_CONCURRENCY conexões, APONT_RPS req/s), numa thread com loop próprio.
+
+    Cada ciclo espera APONT_WINDOW_MS, pega as entradas pendentes, agrupa por
+    ticket (até APONT_MAX_ACTIONS) e manda cada grupo em um só PATCH com várias
+    actions. Resultado por entrada:
+    - 200: done;
+    - 429 / 5xx / 401 / rede: volta para pending com backoff (429 respeita
+      Retry-After) até APONT_MAX_ATTEMPTS tentativas, depois failed;
+    - outros 4xx: o grupo é reenviado entrada por entrada para isolar a
+      inválida, que fica failed.
+
+    Entradas pegas para envio ficam em 'sending' com um lease (dono + validade
+    de APONT_LEASE_S). Se o processo cai, o lease expira e qualquer gateway
+    (deste ou de outro worker) as devolve à fila; rows com lease válido de outro
+    worker nunca são tocadas. Entrega "pelo menos uma vez": uma entrada pode ser
+    apontada em dobro se o processo caiu depois de o Movidesk aceitar o PATCH.
+    Com vários workers do uvicorn, cada um tem seu próprio gateway e o orçamento
+    total ao Movidesk é workers × APONT_RPS.
+
+    Um erro num ciclo (config central ilegível, banco travado, falha inesperada
+    do cliente) é registrado no log, as entradas pegas voltam para pending com
+    backoff e o loop continua; se a thread morrer mesmo assim, o próximo
+    notify() sobe outra.
+    """
+
+    def __init__(self):
+        self._owner = uuid.uuid4().hex
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[Thread] = None
+        self._ready = Event()
+        self._lock = Lock()
+        self._stopped = False
+
+    def start(self) -> None:
+        with self._lock:
+            self._stopped = False
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._ready.clear()
+            self._thread = Thread(target=lambda: asyncio.run(self._main()), name="apontamentos-gateway",
+                                  daemon=True)
+            self._thread.start()
+        self._ready.wait(timeout=5)
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._call_in_loop(lambda: (self._stopping.set(), self._wake.set()))
+        thread.join(timeout=35)
+
+    def notify(self) -> None:
+        """Acorda o ciclo (chamado após um POST). Nunca levanta: a entrada já está gravada."""
+        try:
+            if not self._stopped and (self._thread is None or not self._thread.is_alive()):
+                self.start()
+            self._call_in_loop(lambda: self._wake.set())
+        except Exception:
+            logger.exception("gateway de apontamentos: falha ao acordar o ciclo")
+
+    def _call_in_loop(self, fn) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(fn)
+        except RuntimeError:  # loop fechou entre o teste e a chamada
+            pass
+
+    async def _main(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._ready.set()
+        client = AsyncMovideskClient({}, max_concurrency=APONT_CONCURRENCY, max_rps=APONT_RPS)
+        conn: Optional[sqlite3.Connection] = None
+        try:
+            while not self._stopping.is_set():
+                try:
+                    if conn is None:
+                        conn = get_db()
+                    delay = self._next_due(conn)
+                except Exception:
+                    logger.exception("gateway de apontamentos: falha ao consultar a fila")
+                    delay = 5.0
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                if self._stopping.is_set():
+                    break
+                await asyncio.sleep(APONT_WINDOW_MS / 1000)  # junta mais entradas do mesmo ticket
+                if conn is None:
+                    continue
+                claimed: List[int] = []
+                try:
+                    await self._cycle(conn, client, claimed)
+                except Exception:
+                    logger.exception("gateway de apontamentos: ciclo falhou; %d entradas voltam à fila",
+                                     len(claimed))
+                    self._release(conn, claimed)
+        finally:
+            await client.aclose()
+            if conn is not None:
+                conn.close()
+
+    def _release(self, conn: sqlite3.Connection, ids: List[int]) -> None:
+        """Devolve à fila, com backoff, as entradas deste gateway que o ciclo com erro tinha pego."""
+        try:
+            conn.rollback()
+            if ids:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE apontamentos SET status = 'pending', lease_owner = NULL, next_attempt_at = ?, "
+                    "updated_at = ? WHERE id = ? AND status = 'sending' AND lease_owner = ?",
+                    [(now + 30, now, i, self._owner) for i in ids],
+                )
+                conn.commit()
+        except Exception:
+            # banco indisponível: o lease expira e as entradas voltam sozinhas
+            logger.exception("gateway de apontamentos: falha ao devolver entradas à fila")
+
+    def _next_due(self, conn: sqlite3.Connection) -> float:
+        row = conn.execute(
+            "SELECT MIN(CASE WHEN status = 'pending' THEN next_attempt_at ELSE lease_until END) "
+            "FROM apontamentos WHERE status IN ('pending', 'sending')"
+        ).fetchone()
+        if row[0] is None:
+            return 60.0
+        return min(60.0, max(0.0, row[0] - time.time()))
+
+    async def _cycle(self, conn: sqlite3.Connection, client: AsyncMovideskClient, claimed: List[int]) -> None:
+        # config antes do claim: se estiver ilegível, nada fica preso em 'sending'
+        client.cfg = _read_central_config()
+
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")  # claim atômico entre workers
+        rows = conn.execute(
+            "SELECT id, ticket_id, action_json, attempts FROM apontamentos "
+            "WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'sending' AND lease_until < ?) "
+            "ORDER BY id LIMIT ?",
+            (now, now, APONT_MAX_ACTIONS * APONT_CONCURRENCY * 4),
+        ).fetchall()
+        if not rows:
+            conn.rollback()
+            return
+        conn.executemany(
+            "UPDATE apontamentos SET status = 'sending', lease_owner = ?, lease_until = ?, updated_at = ? "
+            "WHERE id = ?",
+            [(self._owner, now + APONT_LEASE_S, now, r[0]) for r in rows],
+        )
+        conn.commit()
+        claimed.extend(r[0] for r in rows)
+
+        groups: Dict[str, list] = {}
+        for r in rows:
+            groups.setdefault(r[1], []).append(r)
+        batches = [g[i:i + APONT_MAX_ACTIONS] for g in groups.values()
+                   for i in range(0, len(g), APONT_MAX_ACTIONS)]
+        results = await asyncio.gather(*(self._send(client, b) for b in batches))
+        updates = [u for res in results for u in res]
+        now = time.time()
+        conn.executemany(
+            "UPDATE apontamentos SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, "
+            "lease_owner = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?",
+            [(st, att, err, nxt, now, i, self._owner) for i, st, att, err, nxt in updates],
+        )
+        conn.commit()
+
+    async def _send(self, client: AsyncMovideskClient, batch: list) -> list:
+        """Devolve (id, status, attempts, last_error, next_attempt_at) de cada entrada do lote."""
+        ticket_id = batch[0][1]
+        try:
+            await client.apontar_acoes(ticket_id, [json.loads(r[2]) for r in batch])
+            return [(r[0], "done", r[3] + 1, None, 0) for r in batch]
+        except MovideskHTTPError as e:
+            if e.status != 401 and e.status != 429 and 400 <= e.status < 500:
+                if len(batch) > 1:
+                    parts = await asyncio.gather(*(self._send(client, [r]) for r in batch))
+                    return [u for p in parts for u in p]
+                return [(batch[0][0], "failed", batch[0][3] + 1, e.user_message, 0)]
+            return [self._retry(r, e.user_message, e.retry_after) for r in batch]
+        except AppError as e:
+            return [self._retry(r, e.user_message) for r in batch]
+        except Exception as e:
+            logger.exception("gateway de apontamentos: erro inesperado no ticket %s", ticket_id)
+            return [self._retry(r, repr(e)) for r in batch]
+
+    def _retry(self, row, error: str, retry_after: Optional[float] = None):
+        attempts = row[3] + 1
+        if attempts >= APONT_MAX_ATTEMPTS:
+            return (row[0], "failed", attempts, error, 0)
+        backoff = retry_after if retry_after else min(300.0, 2.0 ** attempts)
+        return (row[0], "pending", attempts, error, time.time() + backoff)
+
+_gateway = _ApontamentoGateway()
+
+class ApontamentoIn(BaseModel):
+    # mesmos campos de movidesk.api_client.apontar_horas
+    ticket_id: str
+    descricao: str = Field(max_length=4000)  # vira linha durável na fila: tamanho limitado
+    data_str: str  # DD/MM/AAAA
+    hora_inicio: str  # HH:MM
+    hora_fim: str  # HH:MM
+    agente_id: str = Field(max_length=64)
+
+class ApontamentoStatus(BaseModel):
+    id: int
+    ticket_id: str
+    status: str  # pending | sending | done | failed
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+@app.post("/apontamentos", response_model=ApontamentoStatus, status_code=202)
+def criar_apontamento(
+    ap: ApontamentoIn,
+    request: Request,
+    x_config_key: Optional[str] = Header(default=None),
+):
+    # o orçamento ao Movidesk (APONT_RPS) é global: sem limite por cliente, um script
+    # enche a fila e empurra os apontamentos dos outros por horas
+    _throttle(_apont_limiter, request, x_config_key)
+    cfg = _read_central_config()
+    try:
+        # mesma validação/payload do cliente desktop
+        _, payload = build_request(cfg, ap.ticket_id, ap.descricao, ap.data_str, ap.hora_inicio,
+                                   ap.hora_fim, ap.agente_id, {})
+    except ConfigError as e:  # token ausente no config central: erro do servidor, não da entrada
+        raise HTTPException(status_code=503, detail=e.user_message)
+    except AppError as e:
+        raise HTTPException(status_code=422, detail=e.user_message)
+
+    now = time.time()
+    conn = get_db()
+    try:
+        queued = conn.execute(
+            "SELECT COUNT(*) FROM apontamentos WHERE status IN ('pending', 'sending')").fetchone()[0]
+        if queued >= APONT_MAX_QUEUE:
+            raise HTTPException(status_code=503, detail="fila de apontamentos cheia",
+                                headers={"Retry-After": "60"})
+        cur = conn.execute(
+            "INSERT INTO apontamentos (ticket_id, action_json, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (ap.ticket_id, json.dumps(payload["actions"][0], ensure_ascii=False), now, now),
+        )
+        conn.commit()  # durável antes de responder
+        ap_id = cur.lastrowid
+    finally:
+        conn.close()
+    _gateway.notify()
+    return {"id": ap_id, "ticket_id": ap.ticket_id, "status": "pending", "attempts": 0,
+            "last_error": None, "created_at": now, "updated_at": now}
+
+@app.get("/apontamentos/{ap_id}", response_model=ApontamentoStatus)
+def status_apontamento(ap_id: int):
+    conn = get_db()
+    try:
+        row = conn.execute(
+            "SELECT id, ticket_id, status, attempts, last_error, created_at, updated_at "
+            "FROM apontamentos WHERE id = ?", (ap_id,),
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise HTTPException(status_code=404, detail="apontamento não encontrado")
+    keys = ("id", "ticket_id", "status", "attempts", "last_error", "created_at", "updated_at")
+    return dict(zip(keys, row))
+
 # =========================
 # Execução local
 # =========================